@@ -38,7 +38,7 @@ install_requires = [
     'spam-lists',
 ]
 
-tests_require = ['nose-parameterized']
+tests_require = ['pytest']
 
 setup(
     name=name,
@@ -54,6 +54,7 @@ setup(
     },
     include_package_data=True,
     install_requires=install_requires,
+    python_requires='>=3.6',
     license=_license,
     classifiers=(
         'Development Status :: 4 - Beta',
@@ -61,7 +62,7 @@ setup(
         'Framework :: Flask',
         'Natural Language :: English',
         'License :: OSI Approved :: MIT License',
-        'Programming Language :: Python :: 3.4',
+        'Programming Language :: Python :: 3.6',
         'Topic :: Internet :: WWW/HTTP',
         'Topic :: Internet :: WWW/HTTP :: Dynamic Content',
         'Topic :: Internet :: WWW/HTTP :: Site Management',
@@ -2,11 +2,10 @@
 
 """Tests for domain and persistence-related classes and functions."""
 # pylint: disable=C0103
-from collections import OrderedDict
+from string import ascii_lowercase, digits
 import unittest
 from unittest.mock import Mock, patch, MagicMock
 
-from nose_parameterized import parameterized
 from sqlalchemy.orm.exc import MultipleResultsFound
 
 from url_shortener.domain_and_persistence import (
@@ -44,6 +43,17 @@ class HomoglyphReplacementMapTest(unittest.TestCase):
 
         self.assertCountEqual(expected, actual)
 
+    def test_homoglyph_replacement_map_for_regex_metacharacters(self):
+        """Test if replacement characters are treated literally.
+
+        Characters with a special meaning in regular expressions, like
+        '-' between two other characters, are expected to represent
+        only themselves.
+        """
+        actual = homoglyph_replacement_map('b-o')
+
+        self.assertEqual({'6': 'b'}, actual)
+
 
 class AliasFactoryTest(unittest.TestCase):
     """Tests for AliasFactory class.
@@ -78,23 +88,25 @@ class AliasFactoryTest(unittest.TestCase):
     MAX_LEN = 6
 
     def setUp(self):
-        self.randint_patcher = patch(
+        randint_patcher = patch(
             'url_shortener.domain_and_persistence.randint'
         )
-        self.randint_mock = self.randint_patcher.start()
+        self.randint_mock = randint_patcher.start()
+        self.addCleanup(randint_patcher.stop)
 
-        self.choice_patcher = patch(
-            'url_shortener.domain_and_persistence.choice'
+        choices_patcher = patch(
+            'url_shortener.domain_and_persistence.choices'
         )
-        self.choice_mock = self.choice_patcher.start()
+        self.choices_mock = choices_patcher.start()
+        self.addCleanup(choices_patcher.stop)
 
-        self.homoglyph_replacement_map_patcher = patch(
+        homoglyph_replacement_map_patcher = patch(
             'url_shortener.domain_and_persistence.homoglyph_replacement_map'
         )
-
         self.homoglyph_replacement_map_mock = (
-            self.homoglyph_replacement_map_patcher.start()
+            homoglyph_replacement_map_patcher.start()
         )
+        self.addCleanup(homoglyph_replacement_map_patcher.stop)
 
         self.homoglyph_replacement_map_mock.return_value = (
             self.HOMOGLYPH_REPLACEMENT
@@ -106,76 +118,83 @@ class AliasFactoryTest(unittest.TestCase):
             self.MAX_LEN
         )
 
-    def tearDown(self):
-        self.randint_patcher.stop()
-        self.choice_patcher.stop()
-        self.homoglyph_replacement_map_patcher.stop()
-
-    @parameterized.expand([
-        ('min > max', 5, 4),
-        ('min = 0', 0, 4),
-        ('min < 0', -2, 4),
-    ])
-    def test_init_raises_alias_length_value_error(self, _, min_len, max_len):
+    def test_init_raises_alias_length_value_error(self):
         """Test for expected occurence of AliasLengthValueError.
 
         The constructor is expected to raise AliasLengthValueError
         for min_length and max_length not fulfilling
         0 < min_length <= max_length condition.
-
-        :param min_len: value of min_length parameter of AliasAlphabet
-        constructor
-        :param max_len: value of max_length parameter of AliasAlphabet
-        constructor
         """
-        self.assertRaises(
-            AliasLengthValueError,
-            AliasFactory,
-            self.CHARS,
-            min_len,
-            max_len
-        )
-
-    @parameterized.expand([
-        ('no_homoglyphs', 'racdinv', 'acdinrv'),
-        ('multiletter_homoglyphs', 'acrnvv', 'acnrv'),
-        ('homoglyphs', '1azcdl2', '12acd')
-    ])
-    def test_alphabet_for_chars_with(self, _, chars, expected):
+        for label, min_len, max_len in (
+                ('min > max', 5, 4),
+                ('min = 0', 0, 4),
+                ('min < 0', -2, 4)
+        ):
+            with self.subTest(label):
+                self.assertRaises(
+                    AliasLengthValueError,
+                    AliasFactory,
+                    self.CHARS,
+                    min_len,
+                    max_len
+                )
+
+    def test_alphabet(self):
         """Test if the alphabet attribute has expected value.
 
-        :param chars: characters to be used for an instance of the
-        tested class
-        :param expected: an expected value of the attribute for
-        given characters
+        The value is expected to depend on the characters used for
+        an instance of the tested class.
         """
-        factory = AliasFactory(chars, self.MIN_LEN, self.MAX_LEN)
+        for label, chars, expected in (
+                ('no_homoglyphs', 'racdinv', 'acdinrv'),
+                ('multiletter_homoglyphs', 'acrnvv', 'acnrv'),
+                ('homoglyphs', '1azcdl2', '12acd')
+        ):
+            with self.subTest(label):
+                factory = AliasFactory(chars, self.MIN_LEN, self.MAX_LEN)
 
-        self.assertEqual(expected, factory.alphabet)
+                self.assertEqual(expected, factory.alphabet)
 
-    @parameterized.expand([
-        (3, 'cd33d', 'cd3'),
-        (4, 'ici23', 'ia2'),
-        (5, 'ici4512', 'ia45')
-    ])
-    def test_create_random_of_length(self, init_len, init_choice, expected):
-        """Test create_random method for expected results.
-
-        For given alias lengths and character choices, the method
-        is expected to return predictable values.
+    def test_alphabet_setter_skips_unchanged_characters(self):
+        """Test if the same characters don't cause recomputation.
 
-        :param init_len: initial length value to be provided by the mock
-        of the randint function
-        :param init_choice: initial choice of characters to be provided
-        by the mock of the choice function
-        :param expected: a final alias string expected for given setup
+        The homoglyph replacement map is expected to be recomputed only
+        when the set of characters assigned to the alphabet changes.
         """
-        self.randint_mock.return_value = init_len
-        self.choice_mock.side_effect = init_choice
+        self.homoglyph_replacement_map_mock.reset_mock()
 
-        actual = self.tested_instance.create_random()
+        self.tested_instance.alphabet = ''.join(reversed(self.CHARS))
+        self.homoglyph_replacement_map_mock.assert_not_called()
 
-        self.assertEqual(expected, actual)
+        self.tested_instance.alphabet = self.CHARS + 'b'
+        self.homoglyph_replacement_map_mock.assert_called_once_with(
+            self.CHARS + 'b'
+        )
+
+    def test_create_random(self):
+        """Test create_random method for expected results.
+
+        For given alias lengths (provided by the mock of the randint
+        function) and character choices (provided by the mock of
+        the choices function), the method is expected to return
+        predictable values.
+        """
+        for init_len, init_choice, expected in (
+                (3, 'cd3', 'cd3'),
+                (4, 'ici2', 'ia2'),
+                (5, 'ici45', 'ia45')
+        ):
+            with self.subTest(init_len=init_len, init_choice=init_choice):
+                self.randint_mock.return_value = init_len
+                self.choices_mock.return_value = list(init_choice)
+
+                actual = self.tested_instance.create_random()
+
+                self.assertEqual(expected, actual)
+                self.choices_mock.assert_called_with(
+                    self.tested_instance.alphabet,
+                    k=init_len
+                )
 
     def test_create_random_for_first_result_shorter_than_min_length(self):
         """Test the method for generating a long enough alias value.
@@ -187,36 +206,33 @@ class AliasFactoryTest(unittest.TestCase):
         the configured range.
         """
         self.randint_mock.side_effect = self.MIN_LEN, self.MIN_LEN + 1
-        self.choice_mock.side_effect = 'civv4'
+        self.choices_mock.side_effect = list('ci'), list('vv4')
         expected = 'w4'
 
         actual = self.tested_instance.create_random()
 
         self.assertEqual(expected, actual)
 
-    @parameterized.expand([
-        ('no_homoglyphs', 'acd12', 'acd12'),
-        ('homoglyphs', 'al23', 'a123'),
-        ('multiletter_homoglyphs', 'ac144', 'ad44'),
-        ('homoglyphs_of_both_types', 'lc144', '1d44'),
-        ('homoglyphs_of_both_types', 'cl44', 'd44'),
-        ('a_homoglyph_replacement_not_in_the_alphabet', 'acrn', 'acrn'),
-        ('a_char_replaced_by_a_multiletter_homoglyph', 'acm', 'acrn')
-    ])
-    def test_from_string_with(self, _, string, expected):
+    def test_from_string(self):
         """Test return values of the method for given strings.
 
         For given strings, the method is expected to return predictable
         values, with potentially confusig characters replaced by their
         homoglyphs included in the alphabet attribute.
-
-        :param string: a string alias that can contain potentially
-        confusing characters
-        :param expected: a value of alias expected to be returned
         """
-        actual = self.tested_instance.from_string(string)
-
-        self.assertEqual(expected, actual)
+        for label, string, expected in (
+                ('no_homoglyphs', 'acd12', 'acd12'),
+                ('homoglyphs', 'al23', 'a123'),
+                ('multiletter_homoglyphs', 'ac144', 'ad44'),
+                ('homoglyphs_of_both_types', 'lc144', '1d44'),
+                ('homoglyphs_of_both_types', 'cl44', 'd44'),
+                ('replacement_not_in_the_alphabet', 'acrn', 'acrn'),
+                ('char_replaced_by_a_multiletter_homoglyph', 'acm', 'acrn')
+        ):
+            with self.subTest(label, string=string):
+                actual = self.tested_instance.from_string(string)
+
+                self.assertEqual(expected, actual)
 
     def test_from_string_raises_alias_value_error(self):
         """Test the method for expected occurence of AliasValueError.
@@ -236,19 +252,20 @@ class AliasFactoryTest(unittest.TestCase):
 class IntegerAliasTest(unittest.TestCase):
     """Tests for IntegerAlias class.
 
-    :ivar alphabet_mock: a mock of AliasAlphabet instance to be used
+    :cvar ALPHABET: an alphabet of the alias factory used by the tested
+    instance. It consists of ten characters, so that each character of
+    an alias corresponds to a decimal digit of its integer value
+    :ivar alias_factory_mock: a mock of AliasFactory instance to be used
     by tested instance
     :ivar tested_instance: instance of IntegerAlias to be used
     during tests
     """
 
+    ALPHABET = 'abcdefghij'
+
     def setUp(self):
-        self.alias_factory_mock = MagicMock()
-        self.alphabet_mock = self.alias_factory_mock.alphabet
-        """We set the length to 10 so that each digit of integer corresponds
-        to a character in string
-        """
-        self.alphabet_mock.__len__.return_value = 10
+        self.alias_factory_mock = Mock()
+        self.alias_factory_mock.alphabet = self.ALPHABET
         self.alias_factory_mock.max_new_alias_length = 4
         self.tested_instance = IntegerAlias(self.alias_factory_mock)
 
@@ -259,20 +276,53 @@ class IntegerAliasTest(unittest.TestCase):
         the alphabet passed to it allows for generating aliases that
         would be converted to integers larger than max int32.
         """
-        alias_factory_mock = MagicMock()
-        alias_factory_mock.alphabet.__len__.return_value = 32
+        alias_factory_mock = Mock()
+        alias_factory_mock.alphabet = (digits + ascii_lowercase)[:32]
         alias_factory_mock.max_new_alias_length = 10
 
         self.assertRaises(AlphabetValueError, IntegerAlias, alias_factory_mock)
 
+    def test_init_raises_alphabet_value_error_for_one_character(self):
+        """Test for AlphabetValueError raised for a one-character alphabet.
+
+        Such an alphabet can't be used to represent integers.
+        """
+        alias_factory_mock = Mock()
+        alias_factory_mock.alphabet = 'a'
+        alias_factory_mock.max_new_alias_length = 1
+
+        self.assertRaises(AlphabetValueError, IntegerAlias, alias_factory_mock)
+
+    def test_init_accepts_max_safe_length(self):
+        """Test if the constructor accepts the longest safe aliases.
+
+        The constructor is expected to accept an alias factory that
+        generates aliases as long as possible without exceeding max int32
+        after conversion to integers.
+        """
+        alphabets_and_lengths = (
+            (self.ALPHABET, 9),
+            ((digits + ascii_lowercase)[:32], 6),
+            ('ab', 30)
+        )
+        for alphabet, max_length in alphabets_and_lengths:
+            with self.subTest(base=len(alphabet)):
+                alias_factory_mock = Mock()
+                alias_factory_mock.alphabet = alphabet
+                alias_factory_mock.max_new_alias_length = max_length
+                IntegerAlias(alias_factory_mock)
+                alias_factory_mock.max_new_alias_length = max_length + 1
+                self.assertRaises(
+                    AlphabetValueError,
+                    IntegerAlias,
+                    alias_factory_mock
+                )
+
     def test_process_bind_param(self):
         """Test if the method converts a string to an integer."""
-        string = 'abxy7'
+        string = 'ibbdc'
         self.alias_factory_mock.from_string.return_value = string
         expected = 81132
-        self.alphabet_mock.index.side_effect = [
-            int(i) for i in reversed(str(expected))
-        ]
         actual = self.tested_instance.process_bind_param(string, Mock())
 
         self.assertEqual(expected, actual)
@@ -294,11 +344,36 @@ class IntegerAliasTest(unittest.TestCase):
     def test_process_result_value(self):
         """Test if the method converts an integer to a string."""
         value = 3241
-        expected = 'm60x'
-        self.alphabet_mock.__getitem__.side_effect = reversed(expected)
+        expected = 'dceb'
         actual = self.tested_instance.process_result_value(value, Mock())
         self.assertEqual(expected, actual)
 
+    def test_process_result_value_reuses_converted_alias(self):
+        """Test if the method caches strings converted from integers."""
+        value = 3241
+        first = self.tested_instance.process_result_value(value, Mock())
+        second = self.tested_instance.process_result_value(value, Mock())
+        self.assertIs(first, second)
+
+    def test_round_trip(self):
+        """Test if converting a string to an integer can be reversed.
+
+        Leading characters representing zero are not preserved
+        by the conversion, just like leading zeros of a number.
+        """
+        self.alias_factory_mock.from_string.side_effect = lambda s: s
+        for string in 'a', 'j', 'ba', 'jjjj', 'bcdef', 'ajbi':
+            with self.subTest(string=string):
+                integer = self.tested_instance.process_bind_param(
+                    string,
+                    Mock()
+                )
+                actual = self.tested_instance.process_result_value(
+                    integer,
+                    Mock()
+                )
+                self.assertEqual(string.lstrip('a') or 'a', actual)
+
 
 class BaseTargetURLTest(unittest.TestCase):
     """Tests for BaseTargetURL class.
@@ -405,10 +480,10 @@ class TestGetCommitChanges(unittest.TestCase):
 
     :cvar LIMIT: a value of INTEGRITY_ERROR_LIMIT option to be set for
     application config mock
-    :cvar TEST_PARAMS: a list of parameter tuples to be used for
+    :cvar TEST_PARAMS: a tuple of parameter tuples to be used for
     testing. Each tuple contains:
-        * a string to be added to test function name
-        * a number of integrity errors to occur during a test
+        * a label of a subtest
+        * a number of integrity errors to occur during a subtest
     :ivar app_mock: a mock of Flask application object to be used
     by the tested function
     :ivar logger_mock: a mock of a logger instance to be used by
@@ -418,12 +493,12 @@ class TestGetCommitChanges(unittest.TestCase):
     """
 
     LIMIT = 10
-    TEST_PARAMS = [
+    TEST_PARAMS = (
         ('no_integrity_errors', 0),
         ('one_integrity_error', 1),
         ('two_integrity_errors', 2),
         ('too_many_integrity_errors', LIMIT + 1)
-    ]
+    )
 
     def setUp(self):
         db_mock = Mock()
@@ -449,33 +524,29 @@ class TestGetCommitChanges(unittest.TestCase):
 
         self.commit_changes()
 
-    @parameterized.expand(TEST_PARAMS)
-    def test_commits_pending_changes_with(self, _, integrity_error_count):
-        """Test if the function commits pending changes.
-
-        :param integrity_error_count: a number of integrity errors to
-        be raised by database session commit method.
-        """
-        self._call(integrity_error_count)
-
-        self.assertEqual(
-            self.session_mock.commit.call_count,
-            integrity_error_count + 1
-        )
-
-    @parameterized.expand(TEST_PARAMS)
-    def test_rolls_back_for(self, _, integrity_error_count):
-        """Test if the changes are rolled back when error occurs.
-
-        :param integrity_error_count: a number of integrity errors to
-        be raised by database session commit method.
-        """
-        self._call(integrity_error_count)
-
-        self.assertEqual(
-            self.session_mock.rollback.call_count,
-            integrity_error_count
-        )
+    def test_commits_pending_changes(self):
+        """Test if the function commits pending changes."""
+        for label, integrity_error_count in self.TEST_PARAMS:
+            with self.subTest(label):
+                self.session_mock.reset_mock()
+                self._call(integrity_error_count)
+
+                self.assertEqual(
+                    self.session_mock.commit.call_count,
+                    integrity_error_count + 1
+                )
+
+    def test_rolls_back(self):
+        """Test if the changes are rolled back when error occurs."""
+        for label, integrity_error_count in self.TEST_PARAMS:
+            with self.subTest(label):
+                self.session_mock.reset_mock()
+                self._call(integrity_error_count)
+
+                self.assertEqual(
+                    self.session_mock.rollback.call_count,
+                    integrity_error_count
+                )
 
     def test_does_not_log_warning(self):
         """Test if warnings are not logged.
@@ -486,7 +557,7 @@ class TestGetCommitChanges(unittest.TestCase):
         for integrity_error_count in range(self.LIMIT + 1):
             self._call(integrity_error_count)
 
-            self.assertEqual(self.logger_mock.call_count, 0)
+            self.logger_mock.assert_not_called()
 
     def test_logs_warning(self):
         """Test if warnings are logged.
@@ -496,9 +567,7 @@ class TestGetCommitChanges(unittest.TestCase):
         """
         self._call(self.LIMIT + 1)
 
-        self.assertTrue(self.logger_mock.called)
-
-
-if __name__ == "__main__":
-    # import sys;sys.argv = ['', 'Test.testName']
-    unittest.main()
+        self.logger_mock.assert_called_once_with(
+            'Number of integrity errors exceeds the limit: {} > {}'
+            ''.format(self.LIMIT + 1, self.LIMIT)
+        )
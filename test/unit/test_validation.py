@@ -1,11 +1,10 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=C0103
 """Tests for validation-related classes and functions."""
+from types import SimpleNamespace
 import unittest
 from unittest.mock import Mock
 
-from nose_parameterized import parameterized
-
 from url_shortener.validation import BlacklistValidator, ValidationError
 
 
@@ -19,9 +18,13 @@ class BlacklistValidatorTest(unittest.TestCase):
 
     :cvar DEFAULT_MESSAGE: a string to be passed as a default message
     to constructor of tested instance
+    :cvar NEXT_MATCH: a mock of a match following the first one
+    returned by composite blacklist. It is never expected to be
+    inspected, so it is shared by all tests
     """
 
     DEFAULT_MESSAGE = 'A default message'
+    NEXT_MATCH = Mock()
 
     def setUp(self):
         self.cb_mock = Mock()
@@ -32,25 +35,23 @@ class BlacklistValidatorTest(unittest.TestCase):
         )
         self.tested_instance.redirect_resolver = Mock()
 
-    @parameterized.expand([
-        ('', None),
-        ('when_passing_a_message', 'A message')
-    ])
-    def test_prepend(self, _, message):
+    def test_prepend(self):
         """Test if the method inserts a blacklist as the first item.
 
         The method is expected to call insert(index, object) method
         of underlying list of url testers, passing 0 as the first argument
-        and a blacklist object as the second.
-
-        :param message: a message to be assigned to a blacklist
+        and a blacklist object as the second, with or without a message
+        assigned to the blacklist.
         """
-        blacklist = Mock()
+        insert = self.cb_mock.url_tester.url_testers.insert
+        for message in None, 'A message':
+            with self.subTest(message=message):
+                insert.reset_mock()
+                blacklist = Mock()
 
-        self.tested_instance.prepend(blacklist, message)
+                self.tested_instance.prepend(blacklist, message)
 
-        insert = self.cb_mock.url_tester.url_testers.insert
-        insert.assert_called_once_with(0, blacklist)
+                insert.assert_called_once_with(0, blacklist)
 
     def test_prepend_adds_message(self):
         """Test if the method adds a message for added blacklist.
@@ -92,23 +93,25 @@ class BlacklistValidatorTest(unittest.TestCase):
         if expected_message != self.DEFAULT_MESSAGE:
             self.tested_instance._msg_map[blacklist] = expected_message
 
-        first = Mock()
-        first.address = url
-        first.source = blacklist
+        first = SimpleNamespace(address=url, source=blacklist)
+
+        self.cb_mock.lookup_matching.return_value = first, self.NEXT_MATCH
 
-        self.cb_mock.lookup_matching.return_value = first, Mock()
+    def test_get_msg_if_blacklisted_returns_message(self):
+        """Test if a message is returned for a blacklisted URL.
 
-    @parameterized.expand([
-        ('a_message', 'A message'),
-        ('default_message', DEFAULT_MESSAGE)
-    ])
-    def test_get_msg_if_blacklisted_returns(self, _, expected_message):
-        """Test if a message is returned for a blacklisted URL."""
+        The message is expected to be either the one associated with
+        the matching blacklist or the default one.
+        """
         url = 'http://first.com'
-        self.set_up_matching_url(url, expected_message)
+        for expected_message in 'A message', self.DEFAULT_MESSAGE:
+            with self.subTest(expected_message=expected_message):
+                self.set_up_matching_url(url, expected_message)
 
-        actual_message = self.tested_instance.get_msg_if_blacklisted(url)
-        self.assertEqual(expected_message, actual_message)
+                actual_message = self.tested_instance.get_msg_if_blacklisted(
+                    url
+                )
+                self.assertEqual(expected_message, actual_message)
 
     def test_get_msg_if_blacklisted_returns_none(self):
         """Test if None is returned for a non-blacklisted URL."""
@@ -119,9 +122,8 @@ class BlacklistValidatorTest(unittest.TestCase):
 
     def _test_assert_not_blacklisted(self, url='http://example.com'):
         """Setup test environment and call the method."""
-        form = Mock()
-        field = Mock()
-        field.data = url
+        form = SimpleNamespace()
+        field = SimpleNamespace(data=url)
 
         self.tested_instance.assert_not_blacklisted(form, field)
 
@@ -151,8 +153,3 @@ class BlacklistValidatorTest(unittest.TestCase):
                 'Test failed: ValidationError was unexpectedly raised'
                 ' by assert_not_blacklisted'
             )
-
-
-if __name__ == "__main__":
-    # import sys;sys.argv = ['', 'Test.testName']
-    unittest.main()
@@ -1,62 +1,108 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=C0103
 
-"""Tests for view classes and functions."""
+"""Tests for view classes and functions.
+
+:var PREVIEW_NOT_PREVIEW_SETUP: parameters for tests differing only
+with the value of 'preview' constructor argument of ShowURL
+:var WHEN_PREVIEW_SETUP: parameters for tests differing in
+combinations of conditions expected to lead to rendering and
+returning of a preview template
+"""
+from types import SimpleNamespace
 import unittest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch, call, DEFAULT
 
-from nose_parameterized import parameterized
 from werkzeug.exceptions import HTTPException
 
+from url_shortener import views
 from url_shortener.views import shorten_url, ShowURL
 
 
+PREVIEW_NOT_PREVIEW_SETUP = (
+    ('preview', True),
+    ('redirect', False)
+)
+WHEN_PREVIEW_SETUP = (
+    ('always', True, ''),
+    ('always_and_with_spam_message', True, 'This is spam'),
+    ('with_spam_message', False, 'This is spam.')
+)
+
+
 class BaseViewTest(object):
-    """A class providing mocks used by all tested view functions."""
+    """A class providing mocks used by all tested view functions.
 
-    def setUp(self):
-        self.render_template_patcher = patch(
-            'url_shortener.views.render_template'
+    The attributes of the views module are patched once per test class
+    and the mocks replacing them are reset before each test.
+
+    :cvar PATCHED_NAMES: names of attributes of the views module to be
+    replaced with mocks. A mock replacing an attribute is available as
+    an instance attribute named after the lowercased name with
+    '_mock' suffix
+    """
+
+    PATCHED_NAMES = ('render_template', 'redirect')
+
+    @classmethod
+    def setUpClass(cls):
+        super(BaseViewTest, cls).setUpClass()
+        cls._patcher = patch.multiple(
+            views,
+            new_callable=Mock,
+            **{n: DEFAULT for n in cls.PATCHED_NAMES}
         )
-        self.render_template_mock = self.render_template_patcher.start()
+        cls._view_mocks = {
+            name.lower() + '_mock': mock
+            for name, mock in cls._patcher.start().items()
+        }
 
-        self.redirect_patcher = patch('url_shortener.views.redirect')
-        self.redirect_mock = self.redirect_patcher.start()
+    @classmethod
+    def tearDownClass(cls):
+        cls._patcher.stop()
+        super(BaseViewTest, cls).tearDownClass()
 
+    def setUp(self):
+        self.reset_mocks()
 
-        self.target_url_class_mock = Mock()
+    def reset_mocks(self):
+        """Restore the mocks used by a test to their initial state.
 
-    def tearDown(self):
-        self.render_template_patcher.stop()
-        self.redirect_patcher.stop()
+        Test classes extend this method to prepare any mocks specific
+        to them.
+        """
+        for attribute_name, mock in self._view_mocks.items():
+            mock.reset_mock(return_value=True, side_effect=True)
+            setattr(self, attribute_name, mock)
 
-class ShortenURLTest(BaseViewTest, unittest.TestCase):
-    """Tests for shorten_url function."""
+        self.target_url_class_mock = Mock()
 
-    def setUp(self):
-        self.form_class_mock = Mock()
-        self.form_mock = self.form_class_mock()
-        self.form_mock.errors.values = MagicMock()
 
-        self.commit_changes_mock = Mock()
+class ShortenURLTest(BaseViewTest, unittest.TestCase):
+    """Tests for shorten_url function.
 
-        self.markup_patcher = patch('url_shortener.views.Markup')
-        self.markup_mock = self.markup_patcher.start()
+    :ivar target_url: a stand-in for the target URL object returned by
+    get_or_create. The view only reads its attributes, so it doesn't
+    need to be a mock
+    """
 
-        self.url_for_patcher = patch('url_shortener.views.url_for')
-        self.url_for_mock = self.url_for_patcher.start()
+    PATCHED_NAMES = BaseViewTest.PATCHED_NAMES + ('Markup', 'url_for', 'flash')
 
-        self.flash_patcher = patch('url_shortener.views.flash')
-        self.flash_mock = self.flash_patcher.start()
+    def reset_mocks(self):
+        super(ShortenURLTest, self).reset_mocks()
 
-        super(ShortenURLTest, self).setUp()
+        self.form_class_mock = Mock()
+        self.form_mock = self.form_class_mock()
 
-    def tearDown(self):
-        self.markup_patcher.stop()
-        self.url_for_patcher.stop()
-        self.flash_patcher.stop()
+        self.commit_changes_mock = Mock()
 
-        super(ShortenURLTest, self).tearDown()
+        self.target_url = SimpleNamespace(
+            short_url='http://sho.rt/abc',
+            preview_url='http://sho.rt/preview/abc'
+        )
+        self.target_url_class_mock.get_or_create.return_value = (
+            self.target_url
+        )
 
     def _call(self):
         """Call tested function with all arguments."""
@@ -77,7 +123,7 @@ class ShortenURLTest(BaseViewTest, unittest.TestCase):
     def test_registers_new_short_url(self):
         """Test if commit_changes function is called."""
         self._call()
-        self.assertTrue(self.commit_changes_mock.called)
+        self.commit_changes_mock.assert_called_once_with()
 
     def test_redirects_to_the_same_route(self):
         """Test if a user is redirected to form page."""
@@ -94,17 +140,15 @@ class ShortenURLTest(BaseViewTest, unittest.TestCase):
 
     def test_prepares_success_message(self):
         """Test if a message with specified elements is prepared."""
-        url_mock = self.target_url_class_mock.get_or_create.return_value
+        url = self.target_url
 
         self._call()
 
-        assert_called = (
-            self.markup_mock.return_value.format.assert_any_call
-        )
-
-        assert_called('Original URL', url_mock, ' class=truncated')
-        assert_called('Short URL', url_mock.short_url, '')
-        assert_called('Preview available at', url_mock.preview_url, '')
+        self.markup_mock.return_value.format.assert_has_calls([
+            call('Original URL', url, ' class=truncated'),
+            call('Short URL', url.short_url, ''),
+            call('Preview available at', url.preview_url, '')
+        ])
 
     def test_flashes_success_message(self):
         """Test if all elements of the success message are flashed."""
@@ -135,36 +179,28 @@ class ShortenURLTest(BaseViewTest, unittest.TestCase):
 class TestShowURL(BaseViewTest, unittest.TestCase):
     """Tests for ShowURL class view.
 
-    :cvar PREVIEW_NOT_PREVIEW_SETUP: parameters for tests differing only
-    with the value of 'preview' constructor argument
-    :cvar WHEN_PREVIEW_SETUP: parameters for tests differing in
-    combinations of conditions expected to lead to rendering and
-    returning of a preview template
+    :cvar TARGET_URL: a string value of the target URL found by
+    the view
     :ivar validator_mock: mock for a BlacklistValidator instance to be
     used by the view instance
     :ivar get_msg_if_blacklisted_mock: a mock for get_msg_if_blacklisted
     method of blacklist validator.
+    :ivar target_url_mock: a mock of the target URL found by the view
     """
 
-    PREVIEW_NOT_PREVIEW_SETUP = [
-        ('preview', True),
-        ('redirect', False)
-    ]
-    WHEN_PREVIEW_SETUP = [
-        ('always', True, ''),
-        ('always_and_with_spam_message', True, 'This is spam'),
-        ('with_spam_message', False, 'This is spam.')
-    ]
+    TARGET_URL = 'http://example.com'
+
+    def reset_mocks(self):
+        super(TestShowURL, self).reset_mocks()
 
-    def setUp(self):
         bval = Mock()
         self.validator_mock = bval
         self.get_msg_if_blacklisted_mock = bval.get_msg_if_blacklisted
         self.get_msg_if_blacklisted_mock.return_value = ''
 
-        super(TestShowURL, self).setUp()
-
         self.get_or_404_mock = self.target_url_class_mock.query.get_or_404
+        self.target_url_mock = self.get_or_404_mock.return_value
+        self.target_url_mock.__str__ = Mock(return_value=self.TARGET_URL)
 
     def create_view_and_call_dispatch_request(self, preview, alias='abc'):
         """Prepare view instance and call dispatch request method.
@@ -180,78 +216,72 @@ class TestShowURL(BaseViewTest, unittest.TestCase):
 
         return obj.dispatch_request(alias)
 
-    @parameterized.expand(PREVIEW_NOT_PREVIEW_SETUP)
-    def test_dispatch_request_queries_for_target_url_to(self, _, preview):
-        """Test if the method queries for target URL with the alias.
-
-        :param preview: a preview parameter for ShowURL constructor
-        """
+    def test_dispatch_request_queries_for_target_url(self):
+        """Test if the method queries for target URL with the alias."""
         alias = 'xyz'
 
-        self.create_view_and_call_dispatch_request(preview, alias)
+        for label, preview in PREVIEW_NOT_PREVIEW_SETUP:
+            with self.subTest(label):
+                self.reset_mocks()
 
-        self.get_or_404_mock.assert_called_once_with(alias)
+                self.create_view_and_call_dispatch_request(preview, alias)
 
-    @parameterized.expand(PREVIEW_NOT_PREVIEW_SETUP)
-    def test_dispatch_request_raises_http_error_for(self, _, preview):
-        """Test for a HTTPError occurence.
+                self.get_or_404_mock.assert_called_once_with(alias)
 
-        :param preview: a preview parameter for ShowURL constructor
-        """
-        self.get_or_404_mock.side_effect = HTTPException
+    def test_dispatch_request_raises_http_error(self):
+        """Test for a HTTPError occurence."""
+        for label, preview in PREVIEW_NOT_PREVIEW_SETUP:
+            with self.subTest(label):
+                self.reset_mocks()
+                self.get_or_404_mock.side_effect = HTTPException
 
-        with self.assertRaises(HTTPException):
-            self.create_view_and_call_dispatch_request(preview)
+                with self.assertRaises(HTTPException):
+                    self.create_view_and_call_dispatch_request(preview)
 
-    @parameterized.expand(PREVIEW_NOT_PREVIEW_SETUP)
-    def test_dispatch_request_validates_url(self, _, preview):
-        """Test if the URL is validated.
+    def test_dispatch_request_validates_url(self):
+        """Test if the URL is validated."""
+        for label, preview in PREVIEW_NOT_PREVIEW_SETUP:
+            with self.subTest(label):
+                self.reset_mocks()
 
-        :param preview: a preview parameter for ShowURL constructor
-        """
-        self.create_view_and_call_dispatch_request(preview)
-        target_url = self.get_or_404_mock()
+                self.create_view_and_call_dispatch_request(preview)
 
-        self.get_msg_if_blacklisted_mock.assert_called_once_with(
-            str(target_url)
-        )
-
-    @parameterized.expand(WHEN_PREVIEW_SETUP)
-    def test_dispatch_request_renders_preview(self, _, preview, spam_msg):
-        """Test if the method calls render_preview.
+                self.get_msg_if_blacklisted_mock.assert_called_once_with(
+                    self.TARGET_URL
+                )
 
-        :param preview: a preview parameter for ShowURL constructor
-        :param spam_msg: a message to be provided by the validator
-        """
-        self.get_msg_if_blacklisted_mock.return_value = spam_msg
+    def test_dispatch_request_renders_preview(self):
+        """Test if the method calls render_preview."""
+        for label, preview, spam_msg in WHEN_PREVIEW_SETUP:
+            with self.subTest(label):
+                self.reset_mocks()
+                self.get_msg_if_blacklisted_mock.return_value = spam_msg
 
-        self.create_view_and_call_dispatch_request(preview)
-
-        self.render_template_mock.assert_called_once_with(
-            'preview.html',
-            target_url=self.get_or_404_mock(),
-            warning=spam_msg
-        )
+                self.create_view_and_call_dispatch_request(preview)
 
-    @parameterized.expand(WHEN_PREVIEW_SETUP)
-    def test_dispatch_request_shows_preview(self, _, preview, spam_msg):
-        """Test if the method returns preview.
+                self.render_template_mock.assert_called_once_with(
+                    'preview.html',
+                    target_url=self.target_url_mock,
+                    warning=spam_msg
+                )
 
-        :param preview: a preview parameter for ShowURL constructor
-        :param spam_msg: a message to be provided by the validator
-        """
-        self.get_msg_if_blacklisted_mock.return_value = spam_msg
+    def test_dispatch_request_shows_preview(self):
+        """Test if the method returns preview."""
+        for label, preview, spam_msg in WHEN_PREVIEW_SETUP:
+            with self.subTest(label):
+                self.reset_mocks()
+                self.get_msg_if_blacklisted_mock.return_value = spam_msg
 
-        expected = self.render_template_mock()
-        actual = self.create_view_and_call_dispatch_request(preview)
+                expected = self.render_template_mock()
+                actual = self.create_view_and_call_dispatch_request(preview)
 
-        self.assertEqual(expected, actual)
+                self.assertEqual(expected, actual)
 
     def test_dispatch_request_redirects(self):
         """Test if redirect function is called."""
         self.create_view_and_call_dispatch_request(False)
 
-        self.redirect_mock.assert_called_once_with(self.get_or_404_mock())
+        self.redirect_mock.assert_called_once_with(self.target_url_mock)
 
     def test_dispatch_request_returns_redirect(self):
         """Test if the method returns result of redirection."""
@@ -261,8 +291,3 @@ class TestShowURL(BaseViewTest, unittest.TestCase):
         actual = self.create_view_and_call_dispatch_request(False)
 
         self.assertEqual(expected, actual)
-
-
-if __name__ == "__main__":
-    # import sys;sys.argv = ['', 'Test.testName']
-    unittest.main()
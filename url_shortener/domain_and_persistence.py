@@ -1,9 +1,7 @@
 # -*- coding: utf-8 -*-
 """Elements of domain and persistence layers."""
-from bisect import bisect_left
-from collections import OrderedDict
-from math import log, floor
-from random import randint, choice
+from functools import lru_cache
+from random import randint, choices
 import re
 from string import ascii_lowercase, digits
 
@@ -34,6 +32,16 @@ class AliasLengthValueError(ValueError):
     """The value of alias-length related parameter is incorrect."""
 
 
+# Each group is ordered from its shortest and alphabetically smallest
+# homoglyph, the first one to be considered as a replacement
+_HOMOGLYPH_GROUPS = tuple(
+    tuple(sorted(group, key=lambda s: (len(s), s))) for group in (
+        ('rn', 'm'), ('vv', 'w'), ('9', 'cj', 'g'), ('ci', 'a'), '1Il',
+        ('c1', 'cI', 'cl', 'd'), '0O', '8B', '2zZ', '5sS', '6b'
+    )
+)
+
+
 def homoglyph_replacement_map(replacement_characters):
     """Get a map of homoglyphs to their replacements.
 
@@ -51,19 +59,11 @@ def homoglyph_replacement_map(replacement_characters):
     If there is no replacement in a homoglyph group, no strings
     belonging to that group are included in the result.
     """
-    homoglyph_groups = [
-        ('rn', 'm'), ('vv', 'w'), ('9', 'cj', 'g'), ('ci', 'a'), '1Il',
-        ('c1', 'cI', 'cl', 'd'), '0O', '8B', '2zZ', '5sS', '6b'
-    ]
-
-    pattern = re.compile('^[{}]+$'.format(replacement_characters))
+    allowed = frozenset(replacement_characters)
 
     homoglyph_replacement = {}
-    for group in homoglyph_groups:
-        sorted_homoglyphs = sorted(sorted(group), key=len)
-        replacement = next(
-            (s for s in sorted_homoglyphs if pattern.match(s)), None
-        )
+    for group in _HOMOGLYPH_GROUPS:
+        replacement = next((s for s in group if allowed.issuperset(s)), None)
         if replacement is None:
             continue
         for string in group:
@@ -92,7 +92,10 @@ class AliasFactory(object):
         don't fulfill the condition: 0 < min_length <= max_length
         """
         self._homoglyph_replacement = {}
+        self._homoglyph_pattern = None
         self._alphabet = ''
+        self._alphabet_set = frozenset()
+        self._characters = None
         self.alphabet = characters
         if not 0 < min_length <= max_length:
             raise AliasLengthValueError(
@@ -128,18 +131,23 @@ class AliasFactory(object):
     def alphabet(self, value):
         """Set characters that can appear in an alias.
 
-        This method sets both the value of self._alphabet attribute
-        (accessible as self.alphabet) and the value of
-        self._homoglyph_replacement attribute.
+        This method sets the value of self._alphabet attribute
+        (accessible as self.alphabet), self._alphabet_set attribute
+        (a frozenset of its characters, used for membership tests),
+        the value of self._homoglyph_replacement attribute and
+        the value of self._homoglyph_pattern attribute.
 
         The homoglyph_replacement attribute maps homoglyphs to strings
         representing them in alias values that are newly generated
-        or created from strings. The mappings are ordered by length
-        of both key and value to prevent homoglyph replacement resulting
-        in an introduction of longer homoglyphs that were replaced in
-        a previous iteration (for example: 'c1' being replaced with
-        'd' and then 'cl' being transformed into 'c1' by replacing
-        'l' with '1').
+        or created from strings.
+
+        The homoglyph_pattern attribute is a compiled regular
+        expression matching any of the homoglyphs to be replaced, or
+        None if there are none. The longer homoglyphs precede
+        the shorter ones in it, so that a string is rewritten in
+        a single pass without breaking up a longer homoglyph (for
+        example: 'cl' is replaced with 'd' as a whole, instead of
+        becoming 'c1' by replacing 'l' with '1').
 
         The values in the map are the shortest and the alphabetically
         smallest homoglyphs whose characters were all included in  the
@@ -149,18 +157,26 @@ class AliasFactory(object):
         non-homoglyph characters included in the value and all
         single-character homoglyphs from
         self._homoglyph_replacement.values().
+
+        All these values depend only on the set of characters in
+        the value, so they are not recomputed if it doesn't change.
         """
-        homoglyph_replacement = homoglyph_replacement_map(value)
-        self._homoglyph_replacement = OrderedDict(
-            sorted(
-                ((s, r) for s, r in homoglyph_replacement.items()),
-                key=lambda i: list(map(len, i))
-            )
-        )
+        characters = frozenset(value)
+        if characters == self._characters:
+            return
+
+        self._characters = characters
+        self._homoglyph_replacement = homoglyph_replacement_map(value)
         replaced = self._homoglyph_replacement.keys()
+        self._homoglyph_pattern = None
+        if replaced:
+            self._homoglyph_pattern = re.compile('|'.join(
+                re.escape(s) for s in sorted(replaced, key=len, reverse=True)
+            ))
         self._alphabet = ''.join(
             sorted(c for c in set(value) if c not in replaced)
         )
+        self._alphabet_set = frozenset(self._alphabet)
 
     def _replace_homoglyphs(self, string):
         """Get a string without potentially confusing subsequences.
@@ -169,10 +185,14 @@ class AliasFactory(object):
         :return: a string with all homoglyphs replaced by their
         representations
         """
-        for orig, repl in self._homoglyph_replacement.items():
-            string = string.replace(orig, repl)
+        if self._homoglyph_pattern is None:
+            return string
 
-        return string
+        replacement = self._homoglyph_replacement
+        return self._homoglyph_pattern.sub(
+            lambda match: replacement[match.group()],
+            string
+        )
 
     def create_random(self):
         """Create a random alias for a preconfigured length range.
@@ -188,9 +208,10 @@ class AliasFactory(object):
 
         :return: a randomly generated alias string
         """
+        alphabet = self._alphabet
         while True:
             length = randint(self._min_length, self._max_length)
-            alias = ''.join(choice(self.alphabet) for i in range(length))
+            alias = ''.join(choices(alphabet, k=length))
             alias = self._replace_homoglyphs(alias)
             if len(alias) >= self._min_length:
                 return alias
@@ -209,11 +230,11 @@ class AliasFactory(object):
         """
         string = self._replace_homoglyphs(string)
 
-        unexpected_chars = [x for x in string if x not in self.alphabet]
+        unexpected_chars = set(string).difference(self._alphabet_set)
         if unexpected_chars:
             raise AliasValueError(
                 "The string '{}' contains unsupported characters: "
-                "{}".format(string, ', '.join(unexpected_chars))
+                "{}".format(string, ', '.join(sorted(unexpected_chars)))
             )
         return string
 
@@ -228,10 +249,14 @@ class IntegerAlias(types.TypeDecorator):
     used in generation because we assume the implementation type will
     translate into 32 bit signed integer type of underlying database
     engine used by the application.
+
+    :cvar _alias_cache_size: a maximum number of alias strings
+    converted from integers to be cached by an instance
     """
 
     impl = types.Integer
     _max_int_32 = 2**31 - 1
+    _alias_cache_size = 4096
 
     @inject
     def __init__(self, alias_factory):
@@ -239,10 +264,22 @@ class IntegerAlias(types.TypeDecorator):
 
         :param alias_factory: an instance of AliasFactory to be used
         by the object
+        :raises AlphabetValueError: if the alphabet of the alias factory
+        has fewer than two characters, or if the factory can generate
+        aliases too long to be converted to an integer not larger than
+        max int32
         """
         self._alphabet = alias_factory.alphabet
         base = len(self._alphabet)
-        max_safe_length = int(floor(log(self._max_int_32, base)))
+        if base < 2:
+            raise AlphabetValueError(
+                'The alphabet must contain at least two characters'
+            )
+        max_safe_length = 0
+        smallest_unsafe_value = base
+        while smallest_unsafe_value <= self._max_int_32:
+            max_safe_length += 1
+            smallest_unsafe_value *= base
         max_length = alias_factory.max_new_alias_length
 
         if max_length > max_safe_length:
@@ -255,7 +292,11 @@ class IntegerAlias(types.TypeDecorator):
             )
 
         self._base = base
+        self._digit_values = {c: i for i, c in enumerate(self._alphabet)}
         self._alias_factory = alias_factory
+        self._cached_alias = lru_cache(maxsize=self._alias_cache_size)(
+            self._integer_to_alias
+        )
 
         super(IntegerAlias, self).__init__()
 
@@ -274,9 +315,10 @@ class IntegerAlias(types.TypeDecorator):
         integer = 0
         valid_alias = self._alias_factory.from_string(value)
 
-        for exponent, char in enumerate(reversed(valid_alias)):
-            digit_value = self._alphabet.index(char)
-            integer += digit_value * self._base**exponent
+        base = self._base
+        digit_values = self._digit_values
+        for char in valid_alias:
+            integer = integer * base + digit_values[char]
 
         return integer
 
@@ -291,14 +333,24 @@ class IntegerAlias(types.TypeDecorator):
         used by the database
         :returns: a string converted from the integer
         """
-        string = ''
+        return self._cached_alias(value)
+
+    def _integer_to_alias(self, value):
+        """Convert an integer to an alias string.
+
+        :param value: an integer representing alias string
+        :returns: a string converted from the integer
+        """
+        characters = []
+        base = self._base
+        alphabet = self._alphabet
         while True:
-            value, remainder = divmod(value, self._base)
-            string = self._alphabet[remainder] + string
+            value, remainder = divmod(value, base)
+            characters.append(alphabet[remainder])
             if value == 0:
                 break
 
-        return string
+        return ''.join(reversed(characters))
 
 
 class BaseTargetURL(object):